@@ -1,15 +1,46 @@
 import base64
+import hashlib
 import json
-from fastapi import FastAPI, HTTPException
+import logging
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+import numpy as np
 import tenseal as ts
 from typing import List
 
+log = logging.getLogger("fhe")
+log.setLevel(logging.INFO)
+
 # ----- Configuration -----
-POLY_MOD_DEGREE = 8192
-COEFF_MOD_BITS = [60, 40, 40, 60]
-GLOBAL_SCALE = 2 ** 40
+# The circuit has multiplicative depth 1 (one ct x pt multiply), so N=4096 is
+# enough. Its 109-bit budget at 128-bit security is split as one 30-bit
+# rescaling prime between a 36-bit data prime and a larger 43-bit special
+# prime, which keeps the key-switching noise from sum() rotations small.
+POLY_MOD_DEGREE = 4096
+COEFF_MOD_BITS = [36, 30, 43]
+GLOBAL_SCALE = 2 ** 30
+
+# CKKS packs POLY_MOD_DEGREE / 2 values per ciphertext, which bounds the batch size
+MAX_BATCH_SIZE = POLY_MOD_DEGREE // 2
+
+# Environment variable naming a key file written by save_keys(). When set,
+# every worker loads the same server keys from it instead of generating its own.
+KEYS_PATH_ENV = "FHE_KEYS_PATH"
+
+# Decimal places kept in scores decrypted for server-key clients. CKKS
+# decryption error (~2e-5 here) would otherwise be returned verbatim, and
+# exact decryption results let a client who chose the plaintext recover
+# the server's secret key (IND-CPA-D); 1e-3 is far above that error.
+SERVER_KEY_SCORE_DECIMALS = 3
 
 # Risk Assessment Weights (Higher score = Higher risk)
 # Positive weights INCREASE risk, Negative weights DECREASE risk
@@ -22,6 +53,10 @@ WEIGHTS = [
     -0.15   # Investment Horizon: Longer horizon = Lower risk (more time to recover)
 ]
 
+# Weights are public, so keep them as a plaintext tensor built once
+# rather than encrypting them on every request
+WEIGHTS_PT = ts.plain_tensor(WEIGHTS)
+
 # Feature normalization ranges (for better scoring)
 FEATURE_RANGES = {
     0: (0, 40),      # Experience: 0-40 years
@@ -32,16 +67,57 @@ FEATURE_RANGES = {
     5: (1, 50)       # Time Horizon: 1-50 years
 }
 
+# Normalization bounds as arrays so a request is scaled in one vectorized pass
+FEATURE_MIN = np.array([FEATURE_RANGES[i][0] for i in range(6)], dtype=np.float64)
+FEATURE_MAX = np.array([FEATURE_RANGES[i][1] for i in range(6)], dtype=np.float64)
+FEATURE_INV_SPAN = 1.0 / (FEATURE_MAX - FEATURE_MIN)
+
+# Normalization folded into the weights:
+#   sum(w_i * (x_i - min_i) / span_i) = sum(FUSED_W_i * x_i) + FUSED_BIAS
+# so the encrypted pipeline works on raw (clamped) features directly
+FUSED_W = np.array(WEIGHTS, dtype=np.float64) * FEATURE_INV_SPAN
+FUSED_BIAS = float(np.sum(-FUSED_W * FEATURE_MIN))
+FUSED_W_PT = ts.plain_tensor(FUSED_W.tolist())
+
+# Shared CKKS contexts, built once at startup (see build_contexts).
+# CTX_WITH_ROT carries galois keys for the rotate-and-add in sum();
+# CTX_NO_ROT skips galois keygen for paths that never rotate slots.
+# Both hold secret keys and must never be made public in place.
+CTX_WITH_ROT = None
+CTX_NO_ROT = None
+
+# Public-only serialization of CTX_WITH_ROT served by GET /public-context,
+# and its ETag
+PUBLIC_CTX_BYTES = None
+PUBLIC_CTX_ETAG = None
+
+# LRU cache of deserialized client contexts, keyed by a digest of the
+# serialized payload. A context with galois keys takes ~12.6 MB in memory
+# and every worker process has its own cache, so it is kept small.
+CLIENT_CONTEXT_CACHE_SIZE = 32
+CLIENT_CONTEXTS = OrderedDict()
+CLIENT_CONTEXTS_LOCK = threading.Lock()
+
 class FeatureRequest(BaseModel):
     features: List[float]
 
+class BatchFeatureRequest(BaseModel):
+    features: List[List[float]]
+
 class EncryptedRequest(BaseModel):
     cipher: str
     public_key: str
     relin_keys: str = ""
     galois_keys: str = ""
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # Each worker process builds its contexts once, before serving, loading
+    # the shared server keys from FHE_KEYS_PATH when it is set
+    build_contexts()
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -51,122 +127,252 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def json_body_schema(model):
+    """
+    OpenAPI requestBody for handlers that take the raw Request and parse
+    the body with read_model, so the docs still show the model schema.
+    """
+    return {
+        "requestBody": {
+            "content": {"application/json": {"schema": model.model_json_schema()}},
+            "required": True,
+        }
+    }
+
+async def read_model(request, model):
+    """
+    Validate a JSON body straight from bytes with pydantic-core.
+    Used by endpoints with large bodies (multi-MB keys, big batches) to
+    skip the intermediate json.loads into Python objects.
+    """
+    # Same rule as FastAPI's own body parsing: no Content-Type, or a JSON one
+    content_type = request.headers.get("content-type")
+    if content_type:
+        media_type = content_type.split(";", 1)[0].strip().lower()
+        if media_type != "application/json" and not (
+            media_type.startswith("application/") and media_type.endswith("+json")
+        ):
+            raise HTTPException(
+                status_code=415,
+                detail=f"Unsupported Content-Type {media_type}; expected application/json"
+            )
+    body = await request.body()
+    if not body:
+        # FastAPI treats an empty body as a missing one
+        raise RequestValidationError(
+            [{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}]
+        )
+    try:
+        return model.model_validate_json(body)
+    except ValidationError as e:
+        errors = e.errors(include_url=False)
+        if errors[0]["type"] == "json_invalid":
+            # Only on malformed bodies: re-parse with json to report the
+            # decode error exactly as FastAPI does, with its character offset
+            try:
+                json.loads(body)
+            except json.JSONDecodeError as je:
+                raise RequestValidationError(
+                    [{
+                        "type": "json_invalid",
+                        "loc": ("body", je.pos),
+                        "msg": "JSON decode error",
+                        "input": {},
+                        "ctx": {"error": je.msg},
+                    }],
+                    body=je.doc
+                )
+        # Same fields and "body"-prefixed locations as FastAPI's errors; the
+        # messages come from pydantic's JSON mode, so type errors may word
+        # things differently (e.g. "array" rather than "list")
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in errors]
+        )
+
+def parse_features(features):
+    """
+    Convert features already validated by pydantic as floats to a float64
+    array, rejecting the NaN and infinity values that pydantic lets through.
+    """
+    arr = np.asarray(features, dtype=np.float64)
+    if not np.isfinite(arr).all():
+        raise HTTPException(
+            status_code=400,
+            detail="Features must be finite numbers"
+        )
+    return arr
+
+def finalize_scores(raw_scores):
+    """
+    Vectorized sigmoid(4x) over a batch of raw scores, computed in place on
+    one output buffer. The sigmoid already lies in [0, 1], so no clamp.
+    """
+    out = np.multiply(raw_scores, -4.0)
+    np.exp(out, out=out)
+    out += 1.0
+    np.reciprocal(out, out=out)
+    return out
+
+def finalize_score(raw_score):
+    """Scalar sibling of finalize_scores, so every endpoint shares one sigmoid"""
+    return float(finalize_scores(np.array([raw_score]))[0])
+
+def new_context():
+    """Create a CKKS context with the configured parameters and no evaluation keys"""
+    context = ts.context(
+        ts.SCHEME_TYPE.CKKS,
+        poly_modulus_degree=POLY_MOD_DEGREE,
+        coeff_mod_bit_sizes=COEFF_MOD_BITS
+    )
+    context.global_scale = GLOBAL_SCALE
+    return context
+
+def generate_keys():
+    """
+    Create a fresh server key set. Returns the context holding the secret,
+    relin and galois keys, and its public serialization for /public-context.
+    """
+    context = new_context()
+    # Galois keys back the rotate-and-add in CKKSVector.sum()
+    context.generate_galois_keys()
+    context.generate_relin_keys()
+    # Serialize without the secret key instead of calling
+    # make_context_public() on the shared instance
+    public_bytes = context.serialize(
+        save_public_key=True,
+        save_secret_key=False,
+        save_galois_keys=True,
+        save_relin_keys=True
+    )
+    return context, public_bytes
+
+def save_keys(path):
+    """
+    Write a fresh server key set to path for worker processes to share.
+    The file holds the secret key, so it is created readable by the owner only.
+    """
+    context, public_bytes = generate_keys()
+    # Store the public serialization as generated: relin and galois keys
+    # re-serialize to different bytes after a reload, which would give
+    # each worker its own /public-context bytes and ETag
+    sections = [context.serialize(save_secret_key=True), public_bytes]
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    # The mode above only applies to a new file, so tighten an existing
+    # one before the secret key is written (Windows has no fchmod)
+    if hasattr(os, "fchmod"):
+        os.fchmod(fd, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        for section in sections:
+            f.write(struct.pack(">I", len(section)))
+            f.write(section)
+
+def load_keys(path):
+    """Read a key file written by save_keys(), in the shape generate_keys() returns"""
+    with open(path, "rb") as f:
+        secret_bytes, public_bytes = split_frames(f.read(), 2)
+    return ts.context_from(secret_bytes), public_bytes
+
+def build_contexts():
+    """Generate the CKKS contexts and their keys once and share them across requests"""
+    global CTX_WITH_ROT, CTX_NO_ROT, PUBLIC_CTX_BYTES, PUBLIC_CTX_ETAG
+    keys_path = os.environ.get(KEYS_PATH_ENV)
+    if keys_path:
+        # Same keys in every worker, so /public-context, its ETag and
+        # server-key ciphertexts work whichever worker serves the request
+        CTX_WITH_ROT, PUBLIC_CTX_BYTES = load_keys(keys_path)
+        log.info("✓ Server keys loaded from %s", keys_path)
+    else:
+        CTX_WITH_ROT, PUBLIC_CTX_BYTES = generate_keys()
+
+    # Only ct x pt multiplies and additions, so no evaluation keys at all
+    CTX_NO_ROT = new_context()
+
+    PUBLIC_CTX_ETAG = f'"{hashlib.blake2b(PUBLIC_CTX_BYTES).hexdigest()[:16]}"'
+    log.info("✓ FHE contexts created")
+
 @app.post("/assessment")
-async def compute_risk_score(req: FeatureRequest):
+def compute_risk_score(req: FeatureRequest):
     """
     Simplified FHE demo endpoint that accepts plain features,
     encrypts them, performs homomorphic computation, and returns the result.
     """
     try:
-        print("=== FHE Assessment Request ===")
-        print(f"Received features: {req.features}")
+        log.debug("=== FHE Assessment Request ===")
+        log.debug("Received features: %s", req.features)
         
-        # Validate input
-        if len(req.features) != 6:
+        # Validate input in one vectorized pass
+        features = parse_features(req.features)
+        if features.shape != (6,):
             raise HTTPException(
                 status_code=400,
                 detail=f"Expected 6 features, got {len(req.features)}"
             )
         
-        # Validate each feature is a valid number
-        for i, feature in enumerate(req.features):
-            if not isinstance(feature, (int, float)) or feature != feature:  # NaN check
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Feature {i+1} is not a valid number: {feature}"
-                )
-        
-        # Step 1: Create FHE context
-        try:
-            context = ts.context(
-                ts.SCHEME_TYPE.CKKS,
-                poly_modulus_degree=POLY_MOD_DEGREE,
-                coeff_mod_bit_sizes=COEFF_MOD_BITS
-            )
-            context.global_scale = GLOBAL_SCALE
-            context.generate_galois_keys()
-            context.generate_relin_keys()
-            print("✓ FHE context created")
-            
-        except Exception as ctx_error:
-            print(f"✗ Context setup failed: {ctx_error}")
+        # Step 1: Use the shared FHE context
+        context = CTX_WITH_ROT
+        if context is None:
             raise HTTPException(
-                status_code=500,
-                detail=f"Could not set up encryption context: {str(ctx_error)}"
+                status_code=503,
+                detail="Encryption context is not initialized"
             )
         
-        # Features will be normalized and encrypted in the computation step
-        
-        # Step 3: Normalize features and perform homomorphic computation
+        # Step 2: Encrypt features and perform homomorphic computation
         try:
-            print(f"Original features: {req.features}")
+            # Clamp features to the expected range; normalization itself is
+            # folded into FUSED_W / FUSED_BIAS
+            clamped = np.clip(features, FEATURE_MIN, FEATURE_MAX)
             
-            # Normalize features to 0-1 range for consistent weighting
-            normalized_features = []
-            for i, feature in enumerate(req.features):
-                min_val, max_val = FEATURE_RANGES[i]
-                # Clamp to expected range and normalize
-                clamped = max(min_val, min(max_val, feature))
-                normalized = (clamped - min_val) / (max_val - min_val)
-                normalized_features.append(normalized)
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Clamped features: %s", clamped.tolist())
             
-            print(f"Normalized features: {normalized_features}")
+            # Encrypt raw clamped features
+            enc_features = ts.ckks_vector(context, clamped.tolist())
             
-            # Encrypt normalized features
-            enc_features = ts.ckks_vector(context, normalized_features)
+            # One ct x pt multiply, one reduce-sum and one ct + pt add
+            score_ct = (enc_features * FUSED_W_PT).sum() + FUSED_BIAS
+            risk_score_raw = score_ct.decrypt()[0]
             
-            # Create weights vector for element-wise multiplication
-            weights_vector = ts.ckks_vector(context, WEIGHTS)
+            # Per-feature contributions are reported from the plain inputs
+            components = (FUSED_W * (clamped - FEATURE_MIN)).tolist()
             
-            # Perform element-wise multiplication: features * weights
-            weighted_features = enc_features * weights_vector
+            log.debug("Raw weighted score: %s", risk_score_raw)
+            log.debug("Individual weighted components: %s", components)
             
-            # Sum all weighted features to get the final score
-            decrypted_weighted = weighted_features.decrypt()
-            risk_score_raw = sum(decrypted_weighted)
-            
-            print(f"Raw weighted score: {risk_score_raw}")
-            print(f"Individual weighted components: {decrypted_weighted}")
-            
-            print("✓ Homomorphic computation completed")
+            log.debug("✓ Homomorphic computation completed")
             
         except Exception as comp_error:
-            print(f"✗ Computation failed: {comp_error}")
+            log.error("✗ Computation failed: %s", comp_error)
             raise HTTPException(
                 status_code=500,
                 detail=f"Homomorphic computation failed: {str(comp_error)}"
             )
         
-        # Step 4: Normalize and convert to 0-1 risk score
+        # Step 3: Normalize and convert to 0-1 risk score
         try:
             # The raw score can range roughly from -1 to +1 given our weights
             # Negative scores = lower risk, Positive scores = higher risk
             
-            # Apply sigmoid transformation to get 0-1 score
-            # Multiply by 4 to make the sigmoid more sensitive
-            sigmoid_input = risk_score_raw * 4
-            normalized_score = 1 / (1 + pow(2.718, -sigmoid_input))
-            
-            # Ensure the score is between 0 and 1
-            normalized_score = max(0.0, min(1.0, normalized_score))
+            # Apply sigmoid(4x) to get a 0-1 score; the factor 4 makes
+            # the sigmoid more sensitive
+            normalized_score = finalize_score(risk_score_raw)
             
-            print(f"✓ Final risk score: {normalized_score:.4f}")
+            log.debug("✓ Final risk score: %.4f", normalized_score)
             
             return {
                 "risk_score": normalized_score,
                 "raw_score": risk_score_raw,
                 "components": {
-                    "experience_contribution": decrypted_weighted[0],
-                    "income_contribution": decrypted_weighted[1], 
-                    "risk_appetite_contribution": decrypted_weighted[2],
-                    "knowledge_contribution": decrypted_weighted[3],
-                    "liquidity_contribution": decrypted_weighted[4],
-                    "time_horizon_contribution": decrypted_weighted[5]
+                    "experience_contribution": components[0],
+                    "income_contribution": components[1], 
+                    "risk_appetite_contribution": components[2],
+                    "knowledge_contribution": components[3],
+                    "liquidity_contribution": components[4],
+                    "time_horizon_contribution": components[5]
                 }
             }
             
         except Exception as dec_error:
-            print(f"✗ Decryption failed: {dec_error}")
+            log.error("✗ Decryption failed: %s", dec_error)
             raise HTTPException(
                 status_code=500,
                 detail=f"Could not decrypt result: {str(dec_error)}"
@@ -175,136 +381,387 @@ async def compute_risk_score(req: FeatureRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"✗ Unexpected error: {e}")
+        log.error("✗ Unexpected error: %s", e)
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
         )
 
-@app.post("/assessment-encrypted")
-async def compute_risk_score_encrypted(req: EncryptedRequest):
+def load_client_context(serialized):
+    """
+    Return the public context a client serialized (base64 str or raw bytes).
+    Contexts are cached by a digest of the full payload, so repeat clients
+    skip both the base64 decode and the key deserialization.
+    """
+    if isinstance(serialized, str):
+        serialized = serialized.encode("ascii")
+        is_base64 = True
+    else:
+        is_base64 = False
+    key = (is_base64, hashlib.blake2b(serialized, digest_size=16).digest())
+    
+    with CLIENT_CONTEXTS_LOCK:
+        context = CLIENT_CONTEXTS.get(key)
+        if context is not None:
+            CLIENT_CONTEXTS.move_to_end(key)
+            return context
+    
+    if is_base64:
+        serialized = base64.b64decode(serialized, validate=True)
+    context = ts.context_from(serialized)
+    
+    with CLIENT_CONTEXTS_LOCK:
+        CLIENT_CONTEXTS[key] = context
+        CLIENT_CONTEXTS.move_to_end(key)
+        while len(CLIENT_CONTEXTS) > CLIENT_CONTEXT_CACHE_SIZE:
+            CLIENT_CONTEXTS.popitem(last=False)
+    return context
+
+def evaluate_encrypted(context, cipher_bytes):
+    """Score a serialized client ciphertext and return the encrypted score"""
+    # The reduce-sum rotates slots, so the score stays encrypted end to end
+    # only if the context carries galois keys
+    if not context.has_galois_keys():
+        raise HTTPException(
+            status_code=400,
+            detail="Context has no galois keys; serialize it with save_galois_keys=True"
+        )
+    
+    # Step 2: Load encrypted vector
+    try:
+        enc_features = ts.ckks_vector_from(context, cipher_bytes)
+        log.debug("✓ Encrypted vector loaded")
+        
+    except Exception as vec_error:
+        log.error("✗ Vector loading failed: %s", vec_error)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Could not load encrypted data: {str(vec_error)}"
+        )
+    
+    if enc_features.size() != 6:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Expected a ciphertext of 6 features, got {enc_features.size()}"
+        )
+    
+    # Step 3: Homomorphic computation
+    try:
+        # Fused weighting and normalization, without ever decrypting
+        encrypted_score = (enc_features * FUSED_W_PT).sum() + FUSED_BIAS
+        
+        log.debug("✓ Homomorphic computation completed")
+        return encrypted_score
+        
+    except Exception as comp_error:
+        log.error("✗ Computation failed: %s", comp_error)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Homomorphic computation failed: {str(comp_error)}"
+        )
+
+def serialize_score(encrypted_score):
+    """Serialize an encrypted score for the client"""
+    try:
+        return encrypted_score.serialize()
+        
+    except Exception as ser_error:
+        log.error("✗ Serialization failed: %s", ser_error)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Could not serialize result: {str(ser_error)}"
+        )
+
+def split_frames(body, count):
+    """Split a body of `count` sections, each prefixed by a 4-byte big-endian length"""
+    frames = []
+    offset = 0
+    for _ in range(count):
+        if offset + 4 > len(body):
+            raise ValueError("Truncated section header")
+        (length,) = struct.unpack_from(">I", body, offset)
+        offset += 4
+        if offset + length > len(body):
+            raise ValueError("Truncated section body")
+        frames.append(body[offset:offset + length])
+        offset += length
+    if offset != len(body):
+        raise ValueError("Trailing bytes after last section")
+    return frames
+
+@app.post("/assessment-encrypted", openapi_extra=json_body_schema(EncryptedRequest))
+async def compute_risk_score_encrypted(request: Request):
     """
     Full FHE endpoint that accepts pre-encrypted data from client.
     This is the more realistic FHE scenario.
     """
+    req = await read_model(request, EncryptedRequest)
+    return await run_in_threadpool(assess_encrypted, req)
+
+def assess_encrypted(req):
+    """Blocking body of /assessment-encrypted, run in the threadpool"""
     try:
-        print("=== Full FHE Assessment Request ===")
-        print(f"Cipher length: {len(req.cipher)}")
-        print(f"Public key length: {len(req.public_key)}")
+        log.debug("=== Full FHE Assessment Request ===")
+        log.debug("Cipher length: %s", len(req.cipher))
+        log.debug("Public key length: %s", len(req.public_key))
         
-        # Step 1: Create context and load keys
-        try:
-            context = ts.context(
-                ts.SCHEME_TYPE.CKKS,
-                poly_modulus_degree=POLY_MOD_DEGREE,
-                coeff_mod_bit_sizes=COEFF_MOD_BITS
+        # TenSEAL cannot load keys on their own; they must travel inside
+        # the serialized context
+        if req.relin_keys or req.galois_keys:
+            raise HTTPException(
+                status_code=400,
+                detail="Send relin and galois keys inside the serialized context in public_key, not as separate fields"
             )
-            context.global_scale = GLOBAL_SCALE
-            
-            # Load public key from client
-            public_key_bytes = base64.b64decode(req.public_key)
-            context.make_context_public()
-            
-            # Load additional keys if provided
-            if req.relin_keys:
-                relin_key_bytes = base64.b64decode(req.relin_keys)
-            
-            if req.galois_keys:
-                galois_key_bytes = base64.b64decode(req.galois_keys)
+        
+        # Step 1: Load the client's public context; without one the cipher
+        # was encrypted under the server's key from GET /public-context
+        try:
+            # TenSEAL bundles the public, relin and galois keys into the
+            # serialized context sent as public_key
+            if req.public_key:
+                context = load_client_context(req.public_key)
+            else:
+                context = CTX_WITH_ROT
+            if context is None:
+                raise RuntimeError("Encryption context is not initialized")
                 
-            print("✓ Context created and configured")
+            log.debug("✓ Context created and configured")
             
         except Exception as ctx_error:
-            print(f"✗ Context setup failed: {ctx_error}")
+            log.error("✗ Context setup failed: %s", ctx_error)
             raise HTTPException(
                 status_code=400,
                 detail=f"Could not set up encryption context: {str(ctx_error)}"
             )
         
-        # Step 2: Load encrypted vector
+        # Steps 2-3: Evaluate on the ciphertext
         try:
-            cipher_bytes = base64.b64decode(req.cipher)
-            enc_features = ts.ckks_vector_from(context, cipher_bytes)
-            print("✓ Encrypted vector loaded")
-            
-        except Exception as vec_error:
-            print(f"✗ Vector loading failed: {vec_error}")
+            cipher_bytes = base64.b64decode(req.cipher, validate=True)
+        except Exception as dec_error:
+            log.error("✗ Cipher decoding failed: %s", dec_error)
             raise HTTPException(
                 status_code=400,
-                detail=f"Could not load encrypted data: {str(vec_error)}"
+                detail=f"Could not load encrypted data: {str(dec_error)}"
             )
+        encrypted_score = evaluate_encrypted(context, cipher_bytes)
+        
+        # Step 4: Client keys get the score back still encrypted. Server
+        # keys mean only the server can decrypt, so it decrypts the single
+        # score slot (never the features) and returns it rounded, so the
+        # CKKS decryption noise is not exposed.
+        if req.public_key:
+            result_b64 = base64.b64encode(serialize_score(encrypted_score)).decode('utf-8')
+            return {"encrypted_score": result_b64}
         
-        # Step 3: Homomorphic computation
         try:
-            # Create weights vector
-            weights_vector = ts.ckks_vector(context, WEIGHTS)
+            raw_score = encrypted_score.decrypt()[0]
+        except Exception as dec_error:
+            log.error("✗ Decryption failed: %s", dec_error)
+            raise HTTPException(
+                status_code=500,
+                detail=f"Could not decrypt result: {str(dec_error)}"
+            )
+        raw_score = round(raw_score, SERVER_KEY_SCORE_DECIMALS)
+        risk_score = finalize_score(raw_score)
+        
+        return {
+            "risk_score": round(risk_score, SERVER_KEY_SCORE_DECIMALS),
+            "raw_score": raw_score
+        }
             
-            # Element-wise multiplication and sum
-            weighted_features = enc_features * weights_vector
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error("✗ Unexpected error: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+@app.post(
+    "/assessment-encrypted-bin",
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}},
+            "required": True,
+        }
+    },
+)
+async def compute_risk_score_encrypted_bin(request: Request):
+    """
+    Binary variant of /assessment-encrypted that skips the base64 round-trip.
+    The body holds two sections, the cipher and the client's serialized
+    public context, each prefixed by a 4-byte big-endian length.
+    """
+    body = await request.body()
+    log.debug("=== Full FHE Assessment Request (binary) ===")
+    log.debug("Body length: %s", len(body))
+    
+    # Split the sections on the loop; it is only slicing
+    try:
+        cipher_bytes, public_key_bytes = split_frames(body, 2)
+    except ValueError as frame_error:
+        log.error("✗ Body parsing failed: %s", frame_error)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Malformed request body: {str(frame_error)}"
+        )
+    
+    result_bytes = await run_in_threadpool(assess_encrypted_bin, cipher_bytes, public_key_bytes)
+    return Response(content=result_bytes, media_type="application/octet-stream")
+
+def assess_encrypted_bin(cipher_bytes, public_key_bytes):
+    """Blocking body of /assessment-encrypted-bin, run in the threadpool"""
+    try:
+        # The binary endpoint always returns a ciphertext, which only the
+        # owner of the context can decrypt, so the context is mandatory
+        if not public_key_bytes:
+            raise HTTPException(
+                status_code=400,
+                detail="The serialized client context section must not be empty"
+            )
+        
+        # Step 1: Load the client's public context
+        try:
+            context = load_client_context(public_key_bytes)
+        except Exception as ctx_error:
+            log.error("✗ Context setup failed: %s", ctx_error)
+            raise HTTPException(
+                status_code=400,
+                detail=f"Could not set up encryption context: {str(ctx_error)}"
+            )
+        
+        # Steps 2-4: Evaluate and serialize the encrypted score
+        return serialize_score(evaluate_encrypted(context, cipher_bytes))
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error("✗ Unexpected error: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+@app.post("/assessment-batch", openapi_extra=json_body_schema(BatchFeatureRequest))
+async def compute_risk_scores_batch(request: Request):
+    """
+    Batched variant of /assessment that scores many users at once.
+    Features are packed feature-major: ciphertext i holds feature i of
+    every user, one user per slot, so the weighted sum is 6 ct x scalar
+    multiplies and 5 ct additions with no slot rotations.
+    """
+    req = await read_model(request, BatchFeatureRequest)
+    return await run_in_threadpool(assess_batch, req)
+
+def assess_batch(req):
+    """Blocking body of /assessment-batch, run in the threadpool"""
+    try:
+        log.debug("=== FHE Batch Assessment Request ===")
+        log.debug("Batch size: %s", len(req.features))
+        
+        # Validate input
+        if not req.features or len(req.features) > MAX_BATCH_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Expected 1 to {MAX_BATCH_SIZE} feature rows, got {len(req.features)}"
+            )
+        
+        # Row lengths first: np.asarray cannot report which row is ragged
+        for i, row in enumerate(req.features):
+            if len(row) != 6:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Row {i+1}: expected 6 features, got {len(row)}"
+                )
+        
+        features = parse_features(req.features)
+        
+        # Step 1: Use the shared FHE context
+        context = CTX_NO_ROT
+        if context is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Encryption context is not initialized"
+            )
+        
+        # Step 2: Encrypt one ciphertext per feature and compute all scores
+        try:
+            clamped = np.clip(features, FEATURE_MIN, FEATURE_MAX)
             
-            # For this demo, we'll decrypt to sum (in practice, you'd use more advanced aggregation)
-            decrypted_weighted = weighted_features.decrypt()
-            final_score = sum(decrypted_weighted)
+            score_ct = None
+            for i in range(6):
+                enc_column = ts.ckks_vector(context, clamped[:, i].tolist())
+                weighted = enc_column * float(FUSED_W[i])
+                score_ct = weighted if score_ct is None else score_ct + weighted
+            score_ct = score_ct + FUSED_BIAS
             
-            # Re-encrypt the final result
-            encrypted_score = ts.ckks_vector(context, [final_score])
+            raw_scores = np.asarray(score_ct.decrypt(), dtype=np.float64)
             
-            print("✓ Homomorphic computation completed")
+            log.debug("✓ Homomorphic computation completed")
             
         except Exception as comp_error:
-            print(f"✗ Computation failed: {comp_error}")
+            log.error("✗ Computation failed: %s", comp_error)
             raise HTTPException(
                 status_code=500,
                 detail=f"Homomorphic computation failed: {str(comp_error)}"
             )
         
-        # Step 4: Return encrypted result
-        try:
-            result_bytes = encrypted_score.serialize()
-            result_b64 = base64.b64encode(result_bytes).decode('utf-8')
-            
-            return {"encrypted_score": result_b64}
-            
-        except Exception as ser_error:
-            print(f"✗ Serialization failed: {ser_error}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Could not serialize result: {str(ser_error)}"
-            )
-            
+        # Step 3: Convert to 0-1 risk scores (same sigmoid as /assessment)
+        risk_scores = finalize_scores(raw_scores)
+        
+        return {
+            "risk_scores": risk_scores.tolist(),
+            "raw_scores": raw_scores.tolist()
+        }
+        
     except HTTPException:
         raise
     except Exception as e:
-        print(f"✗ Unexpected error: {e}")
+        log.error("✗ Unexpected error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
         )
 
+@app.get("/public-context")
+async def get_public_context(request: Request):
+    """
+    Serve the pre-serialized public context (public, relin and galois keys)
+    for clients that encrypt under the server's key and send the cipher to
+    /assessment-encrypted with an empty public_key. The bytes never change
+    while the server runs, so the ETag lets clients and caches revalidate.
+    """
+    if PUBLIC_CTX_BYTES is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Encryption context is not initialized"
+        )
+    
+    headers = {"ETag": PUBLIC_CTX_ETAG}
+    if request.headers.get("if-none-match") == PUBLIC_CTX_ETAG:
+        return Response(status_code=304, headers=headers)
+    
+    return Response(
+        content=PUBLIC_CTX_BYTES,
+        media_type="application/octet-stream",
+        headers=headers
+    )
+
 @app.get("/test")
-async def test_tenseal():
+def test_tenseal():
     """Test endpoint to verify TenSEAL is working"""
     try:
-        # Create test context
-        context = ts.context(
-            ts.SCHEME_TYPE.CKKS,
-            poly_modulus_degree=POLY_MOD_DEGREE,
-            coeff_mod_bit_sizes=COEFF_MOD_BITS
-        )
-        context.global_scale = GLOBAL_SCALE
-        context.generate_galois_keys()
-        context.generate_relin_keys()
+        # Reuse the shared context
+        context = CTX_NO_ROT
         
         # Test encryption and computation
         test_data = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
-        enc_vector = ts.ckks_vector(context, test_data)
-        
-        # Test weighted sum (like our risk assessment)
-        result_vector = ts.ckks_vector(context, WEIGHTS)
         test_vector = ts.ckks_vector(context, test_data)
         
-        # Element-wise multiplication
-        weighted_result = test_vector * result_vector
+        # Test weighted sum (like our risk assessment)
+        # Element-wise ciphertext x plaintext multiplication
+        weighted_result = test_vector * WEIGHTS_PT
         
         # Decrypt to sum the results
         decrypted = weighted_result.decrypt()
@@ -335,6 +792,9 @@ async def root():
         "endpoints": {
             "/assessment": "POST - Simple FHE demo (accepts plain features)",
             "/assessment-encrypted": "POST - Full FHE (accepts encrypted data)",
+            "/assessment-encrypted-bin": "POST - Full FHE with raw binary body and response",
+            "/assessment-batch": "POST - Simple FHE demo for many users, one ciphertext per feature",
+            "/public-context": "GET - Serialized public context for client-side encryption",
             "/test": "GET - Test TenSEAL functionality"
         }
     }
@@ -343,6 +803,29 @@ if __name__ == "__main__":
     import uvicorn
     print("Starting FHE Assessment Server...")
     print(f"TenSEAL version: {ts.__version__}")
-    print(f"Parameters: poly_degree={POLY_MOD_DEGREE}, scale=2^40")
+    print(f"Parameters: poly_degree={POLY_MOD_DEGREE}, scale=2^{GLOBAL_SCALE.bit_length() - 1}")
     print(f"Weights: {WEIGHTS}")
-    uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
+    # Generate the server keys once here so that every worker loads the
+    # same set, unless the caller already points FHE_KEYS_PATH at a key file
+    temp_keys = None
+    if not os.environ.get(KEYS_PATH_ENV):
+        fd, temp_keys = tempfile.mkstemp(prefix="fhe_keys_")
+        os.close(fd)
+        save_keys(temp_keys)
+        os.environ[KEYS_PATH_ENV] = temp_keys
+    # HE work is CPU-bound and SEAL releases the GIL, so one worker process
+    # per core scales throughput; workers need the app as an import string.
+    # uvloop and httptools are used when installed (uvicorn[standard]).
+    try:
+        uvicorn.run(
+            "main:app",
+            app_dir=os.path.dirname(os.path.abspath(__file__)),
+            host="127.0.0.1",
+            port=8000,
+            workers=os.cpu_count() or 1,
+            loop="auto",
+            http="auto"
+        )
+    finally:
+        if temp_keys:
+            os.remove(temp_keys)
\ No newline at end of file